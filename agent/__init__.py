@@ -4,4 +4,12 @@
 This package contains the agent setup and tools for the AutoClerk backend.
 """
 
-from .agent import create_agent, AgentManager
\ No newline at end of file
+__all__ = ['create_agent', 'AgentManager']
+
+def __getattr__(name):
+    # Import the LangChain agent module on first use, so importing
+    # agent.tools (e.g. for OAuth) does not pull in LangChain/Groq
+    if name in __all__:
+        from . import agent as agent_module
+        return getattr(agent_module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -3,7 +3,8 @@
 from langchain_groq import ChatGroq
 from langchain.agents import initialize_agent, AgentType
 from langchain.tools import BaseTool
-from typing import List, Optional
+from langchain_core.callbacks import BaseCallbackHandler
+from typing import Any, Dict, List, Optional
 import os
 from dotenv import load_dotenv
 
@@ -21,6 +22,8 @@ from .tools.gsheets import (
     ReadGoogleSheetTool,
     UpdateGoogleSheetTool,
     AddRowGoogleSheetTool,
+    BatchUpdateGoogleSheetTool,
+    BatchReadGoogleSheetsTool,
     SearchGoogleSheetsTool
 )
 
@@ -34,6 +37,15 @@ from .tools.gmail import (
 # Load environment variables
 load_dotenv()
 
+class _ToolCallRecorder(BaseCallbackHandler):
+    """Records the names of the tools started during one agent run"""
+    
+    def __init__(self):
+        self.tools: List[str] = []
+    
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> None:
+        self.tools.append(serialized.get("name"))
+
 class AgentManager:
     """
     Manages the setup and configuration of the LLM agent and its tools.
@@ -87,6 +99,8 @@ class AgentManager:
             ReadGoogleSheetTool(),
             UpdateGoogleSheetTool(),
             AddRowGoogleSheetTool(),
+            BatchUpdateGoogleSheetTool(),
+            BatchReadGoogleSheetsTool(),
             SearchGoogleSheetsTool(),
             
             # Gmail tools
@@ -123,6 +137,20 @@ class AgentManager:
             Agent response
         """
         return self.agent.run(input_text)
+    
+    def run_with_steps(self, input_text: str):
+        """
+        Run the agent with the given input, also returning its tool calls.
+        
+        Args:
+            input_text: User input text
+            
+        Returns:
+            Tuple of the agent response and the names of the tools it called
+        """
+        recorder = _ToolCallRecorder()
+        result = self.agent.invoke({"input": input_text}, config={"callbacks": [recorder]})
+        return result["output"], recorder.tools
 
 # Create a default agent instance
 def create_agent(api_key: Optional[str] = None, model_name: str = "llama-3.3-70b-versatile"):
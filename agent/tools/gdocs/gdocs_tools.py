@@ -17,7 +17,8 @@ def get_docs_service():
     try:
         creds = authenticate_google_api(DOCS_SCOPES)
         if creds:
-            return build('docs', 'v1', credentials=creds)
+            # Use the discovery document bundled with google-api-python-client
+            return build('docs', 'v1', credentials=creds, static_discovery=True, cache_discovery=False)
         return None
     except Exception as e:
         print(f"❌ Failed to initialize Google Docs service: {str(e)}")
@@ -3,32 +3,35 @@
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
 from typing import Optional, Type, List, Dict, Any
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest
+import httpx
+from cachetools import TTLCache
+import asyncio
+import logging
 import base64
+import binascii
 from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.header import Header
 from email.mime.base import MIMEBase
 from email import encoders
 import os
-import json
+import orjson
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Import the authentication module
-from ..google_auth import authenticate_google_api, GMAIL_SCOPES
+from ..google_auth import authenticate_google_api, get_cached_service, refresh_credentials, GMAIL_SCOPES
 
-# Gmail service will be initialized per request
-gmail_service = None
+logger = logging.getLogger(__name__)
 
 def get_gmail_service():
     """Get Gmail service with current credentials"""
     try:
-        creds = authenticate_google_api(GMAIL_SCOPES)
-        if creds:
-            return build('gmail', 'v1', credentials=creds)
-        return None
+        return get_cached_service('gmail', 'v1', GMAIL_SCOPES)
     except Exception as e:
-        print(f"❌ Failed to initialize Gmail service: {str(e)}")
+        logger.error("Failed to initialize Gmail service: %s", e)
         return None
 
 # Tool Input Schemas
@@ -42,7 +45,8 @@ class SendEmailInput(BaseModel):
 
 class ReadEmailInput(BaseModel):
     email_id: str = Field(description="Gmail message ID to read")
-    format: str = Field("full", description="Message format: 'full', 'metadata', 'minimal', or 'raw'")
+    format: str = Field("metadata", description="Message format: 'full', 'metadata', 'minimal', or 'raw'")
+    include_body: bool = Field(False, description="Whether to fetch and include the email body (implies 'full' format)")
 
 class SearchEmailInput(BaseModel):
     query: str = Field(description="Gmail search query (e.g., 'from:example@gmail.com', 'subject:meeting')")
@@ -55,53 +59,293 @@ class ListEmailsInput(BaseModel):
     query: Optional[str] = Field(None, description="Search query to filter emails")
 
 # Helper functions
+# RFC 5322 caps lines at 998 octets, excluding CRLF
+MAX_LINE_LENGTH = 998
+
+def _encode_header(value):
+    """Encode a header value, using RFC 2047 for non-ASCII text (folded with CRLF)"""
+    value = ' '.join(value.splitlines())
+    if value.isascii():
+        return value.encode('ascii')
+    return Header(value, 'utf-8').encode(linesep='\r\n').encode('ascii')
+
+def create_message_fast(to, subject, body, cc=None, bcc=None):
+    """Create a plain-text message by emitting the RFC 5322 bytes directly."""
+    parts = [
+        b'MIME-Version: 1.0',
+        b'Content-Type: text/plain; charset=utf-8',
+        b'Content-Transfer-Encoding: 8bit',
+        b'To: ' + _encode_header(to),
+        b'Subject: ' + _encode_header(subject)
+    ]
+    if cc:
+        parts.append(b'Cc: ' + _encode_header(cc))
+    if bcc:
+        parts.append(b'Bcc: ' + _encode_header(bcc))
+    
+    raw = b'\r\n'.join(parts) + b'\r\n\r\n' + body.encode('utf-8')
+    return {'raw': base64.urlsafe_b64encode(raw).decode('ascii')}
+
+def _normalize_addrs(addrs):
+    """Normalize a comma-separated string or list of addresses to 'a, b' form"""
+    if isinstance(addrs, str):
+        addrs = addrs.split(',')
+    return ', '.join(addr.strip() for addr in addrs if addr.strip())
+
 def create_message(to, subject, body, cc=None, bcc=None, html=False):
     """Create a message for an email."""
-    if html:
-        message = MIMEMultipart('alternative')
-        text_part = MIMEText(body, 'html')
-    else:
-        message = MIMEText(body)
-        
-    if isinstance(message, MIMEMultipart):
-        message.attach(text_part)
+    to = _normalize_addrs(to)
+    cc = _normalize_addrs(cc) if cc else None
+    bcc = _normalize_addrs(bcc) if bcc else None
+    
+    # Plain text that fits 8bit transfer encoding skips the email generator
+    if not html and all(len(line.encode('utf-8')) <= MAX_LINE_LENGTH for line in body.splitlines()):
+        return create_message_fast(to, subject, body, cc, bcc)
     
-    message['to'] = to
-    message['subject'] = subject
+    message = MIMEText(body, 'html' if html else 'plain', 'utf-8')
+    message['To'] = to
+    message['Subject'] = subject
     
     if cc:
-        message['cc'] = cc
+        message['Cc'] = cc
     if bcc:
-        message['bcc'] = bcc
+        message['Bcc'] = bcc
     
-    return {'raw': base64.urlsafe_b64encode(message.as_bytes()).decode()}
+    return {'raw': base64.urlsafe_b64encode(message.as_bytes()).decode('ascii')}
+
+# Headers the tools actually display
+WANTED_HEADERS = frozenset({'From', 'To', 'Subject', 'Date', 'Cc', 'Bcc'})
 
 def parse_email_headers(headers):
-    """Parse email headers into a readable format"""
-    header_dict = {}
-    for header in headers:
-        header_dict[header['name']] = header['value']
-    return header_dict
+    """Parse the displayed email headers into a dict keyed by title-cased name"""
+    return {
+        header['name'].title(): header['value']
+        for header in headers
+        if header['name'].title() in WANTED_HEADERS
+    }
+
+# Maps the URL-safe base64 alphabet Gmail uses back to the standard one
+_URLSAFE_TRANS = bytes.maketrans(b'-_', b'+/')
+
+def _decode_body_data(data):
+    """Decode a Gmail base64url body into text"""
+    # a2b_base64 ignores surplus padding, so '==' covers any unpadded length
+    return binascii.a2b_base64(data.encode('ascii').translate(_URLSAFE_TRANS) + b'==').decode('utf-8')
+
+# Body MIME types in order of preference; lower rank wins
+_BODY_PREFERENCE = {'text/plain': 0, 'text/html': 1}
 
 def extract_email_body(payload):
     """Extract email body from Gmail API payload"""
-    body = ""
+    best_rank = len(_BODY_PREFERENCE)
+    best_data = None
     
-    if 'parts' in payload:
-        for part in payload['parts']:
-            if part['mimeType'] == 'text/plain':
-                if 'data' in part['body']:
-                    body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-                    break
-            elif part['mimeType'] == 'text/html' and not body:
-                if 'data' in part['body']:
-                    body = base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
-    else:
-        if payload['mimeType'] == 'text/plain' or payload['mimeType'] == 'text/html':
-            if 'data' in payload['body']:
-                body = base64.urlsafe_b64decode(payload['body']['data']).decode('utf-8')
+    # Walk nested multipart trees in document order without recursion
+    stack = [payload]
+    while stack:
+        part = stack.pop()
+        if 'parts' in part:
+            stack.extend(reversed(part['parts']))
+            continue
+        
+        rank = _BODY_PREFERENCE.get(part.get('mimeType'), best_rank)
+        if rank < best_rank and 'data' in part.get('body', {}):
+            best_rank, best_data = rank, part['body']['data']
+            if rank == 0:
+                break
     
-    return body
+    return _decode_body_data(best_data) if best_data else ""
+
+# Gmail accepts at most 100 calls in a single batch request
+GMAIL_BATCH_LIMIT = 100
+
+# Set GMAIL_USE_BATCH=0 to fetch metadata with parallel single requests instead,
+# e.g. when batch requests are blocked or their quota accounting is unwanted
+GMAIL_USE_BATCH = os.getenv('GMAIL_USE_BATCH', '1') != '0'
+
+# Upper bound on concurrent messages.get calls, to stay within Gmail's per-user limits
+GMAIL_MAX_CONCURRENCY = 10
+
+# Only these headers are shown in search/list results
+METADATA_HEADERS = ['From', 'Subject', 'Date']
+
+# Headers shown when reading a single email
+READ_HEADERS = ['From', 'To', 'Subject', 'Date']
+
+# Partial-response masks so Gmail only returns the fields we read
+LIST_FIELDS = 'messages/id,nextPageToken,resultSizeEstimate'
+METADATA_FIELDS = 'id,payload/headers'
+
+# Message headers never change for a given ID, so header-only metadata
+# fetches are shared across tool instances for an hour. Only that variant is
+# cached: full/raw resources can carry megabytes of attachments, and labelIds
+# (UNREAD etc.) change, so they are always fetched fresh.
+_MESSAGE_CACHE = TTLCache(maxsize=1024, ttl=3600)
+_MESSAGE_CACHE_LOCK = threading.Lock()
+
+def _message_cache_key(message_id, format, metadata_headers=None):
+    """Build the message cache key for a messages.get variant"""
+    return (message_id, format, tuple(metadata_headers or ()))
+
+def _get_cached_message(key):
+    """Return a cached message resource, or None on a miss"""
+    with _MESSAGE_CACHE_LOCK:
+        return _MESSAGE_CACHE.get(key)
+
+def _cache_message(key, message):
+    """Store a fetched message resource"""
+    with _MESSAGE_CACHE_LOCK:
+        _MESSAGE_CACHE[key] = message
+
+def _fetch_metadata_batch(service, ids):
+    """Fetch metadata for several messages using batched requests.
+
+    Args:
+        service: Gmail service object
+        ids: Message IDs to fetch
+
+    Returns:
+        List of message resources in the same order as ``ids``
+    """
+    responses = {}
+    errors = []
+
+    for message_id in ids:
+        cached = _get_cached_message(_message_cache_key(message_id, 'metadata', METADATA_HEADERS))
+        if cached is not None:
+            responses[message_id] = cached
+    missing = [message_id for message_id in ids if message_id not in responses]
+
+    def _collect(request_id, response, exception):
+        if exception is not None:
+            errors.append(exception)
+        else:
+            responses[request_id] = response
+            _cache_message(_message_cache_key(request_id, 'metadata', METADATA_HEADERS), response)
+
+    for start in range(0, len(missing), GMAIL_BATCH_LIMIT):
+        batch: BatchHttpRequest = service.new_batch_http_request(callback=_collect)
+        for message_id in missing[start:start + GMAIL_BATCH_LIMIT]:
+            batch.add(
+                service.users().messages().get(
+                    userId='me',
+                    id=message_id,
+                    format='metadata',
+                    metadataHeaders=METADATA_HEADERS,
+                    fields=METADATA_FIELDS
+                ),
+                request_id=message_id
+            )
+        batch.execute()
+
+    if errors:
+        raise errors[0]
+
+    return [responses[message_id] for message_id in ids]
+
+def _fetch_metadata_threaded(service, ids):
+    """Fetch metadata for several messages with concurrent single requests.
+
+    Args:
+        service: Gmail service object
+        ids: Message IDs to fetch
+
+    Returns:
+        List of message resources in the same order as ``ids``
+    """
+    def _get_one(message_id):
+        key = _message_cache_key(message_id, 'metadata', METADATA_HEADERS)
+        message = _get_cached_message(key)
+        if message is None:
+            message = service.users().messages().get(
+                userId='me',
+                id=message_id,
+                format='metadata',
+                metadataHeaders=METADATA_HEADERS,
+                fields=METADATA_FIELDS
+            ).execute()
+            _cache_message(key, message)
+        return message
+
+    with ThreadPoolExecutor(max_workers=GMAIL_MAX_CONCURRENCY) as executor:
+        return list(executor.map(_get_one, ids))
+
+def _fetch_metadata(service, ids):
+    """Fetch metadata for several messages using the configured strategy"""
+    if GMAIL_USE_BATCH:
+        return _fetch_metadata_batch(service, ids)
+    return _fetch_metadata_threaded(service, ids)
+
+def _summarize_message(message):
+    """Reduce a metadata message resource to the fields shown in listings"""
+    headers = parse_email_headers(message.get('payload', {}).get('headers', []))
+    return {
+        "id": message['id'],
+        "from": headers.get('From', 'Unknown'),
+        "subject": headers.get('Subject', 'No Subject'),
+        "date": headers.get('Date', 'Unknown')
+    }
+
+def _format_email_list(title, email_list):
+    """Format summarized emails as a numbered listing"""
+    parts = [title, ""]
+    for i, email in enumerate(email_list, 1):
+        parts.extend([
+            f"{i}. ID: {email['id']}",
+            f"   From: {email['from']}",
+            f"   Subject: {email['subject']}",
+            f"   Date: {email['date']}",
+            ""
+        ])
+    return "\n".join(parts)
+
+# Async Gmail REST helpers used by the _arun paths. Each _arun opens its own
+# HTTP/2 client, so a client is never shared across event loops.
+GMAIL_API_URL = 'https://gmail.googleapis.com/gmail/v1/users/me'
+
+async def _gmail_get(client, creds, path, params):
+    """GET a Gmail REST resource, refreshing the access token once on 401"""
+    params = {key: value for key, value in params.items() if value is not None}
+    url = f"{GMAIL_API_URL}/{path}"
+
+    token = creds.token
+    response = await client.get(url, params=params, headers={'Authorization': f'Bearer {token}'})
+    if response.status_code == 401 and creds.refresh_token:
+        # Shared refresh path: one refresh for all gathered requests, and the new token is saved
+        await asyncio.to_thread(refresh_credentials, creds, token)
+        response = await client.get(url, params=params, headers={'Authorization': f'Bearer {creds.token}'})
+
+    response.raise_for_status()
+    return response.json()
+
+async def _list_messages(client, creds, **params):
+    """List message IDs matching the given messages.list parameters"""
+    return await _gmail_get(client, creds, 'messages', {**params, 'fields': LIST_FIELDS})
+
+async def _get_message(client, creds, message_id):
+    """Fetch the displayed headers of a single message"""
+    key = _message_cache_key(message_id, 'metadata', METADATA_HEADERS)
+    cached = _get_cached_message(key)
+    if cached is not None:
+        return cached
+
+    message = await _gmail_get(client, creds, f'messages/{message_id}', {
+        'format': 'metadata',
+        'metadataHeaders': METADATA_HEADERS,
+        'fields': METADATA_FIELDS
+    })
+    _cache_message(key, message)
+    return message
+
+async def _get_messages(client, creds, ids):
+    """Fetch several messages concurrently, in the same order as ``ids``"""
+    semaphore = asyncio.Semaphore(GMAIL_MAX_CONCURRENCY)
+
+    async def _get_one(message_id):
+        async with semaphore:
+            return await _get_message(client, creds, message_id)
+
+    return await asyncio.gather(*[_get_one(message_id) for message_id in ids])
 
 # Gmail Tools Implementation
 
@@ -117,7 +361,7 @@ class SendGmailTool(BaseTool):
             gmail_service = get_gmail_service()
             if gmail_service is None:
                 error_message = "Gmail service is not available. Please authenticate first by visiting /oauth/login"
-                print(f"❌ {error_message}")
+                logger.error(error_message)
                 return error_message
             
             # Create the email message
@@ -130,21 +374,21 @@ class SendGmailTool(BaseTool):
             ).execute()
             
             message_id = result['id']
-            print(f"📧 Email sent successfully. Message ID: {message_id}")
+            logger.info("Email sent successfully. Message ID: %s", message_id)
             return f"Email sent successfully to {to}. Subject: '{subject}'. Message ID: {message_id}"
             
         except HttpError as error:
             error_message = f"An error occurred while sending email: {error}"
-            print(f"❌ {error_message}")
+            logger.error(error_message)
             return error_message
         except Exception as e:
             error_message = f"An unexpected error occurred: {str(e)}"
-            print(f"❌ {error_message}")
+            logger.error(error_message)
             return error_message
 
     async def _arun(self, to: str, subject: str, body: str, cc: Optional[str] = None, 
                     bcc: Optional[str] = None, html: bool = False):
-        return self._run(to, subject, body, cc, bcc, html)
+        return await asyncio.to_thread(self._run, to, subject, body, cc, bcc, html)
 
 
 class ReadGmailTool(BaseTool):
@@ -152,26 +396,38 @@ class ReadGmailTool(BaseTool):
     description: str = "Read a specific email by its Gmail message ID"
     args_schema: Type[BaseModel] = ReadEmailInput
 
-    def _run(self, email_id: str, format: str = "full"):
+    def _run(self, email_id: str, format: str = "metadata", include_body: bool = False):
         try:
             # Get Gmail service with current credentials
             gmail_service = get_gmail_service()
             if gmail_service is None:
                 error_message = "Gmail service is not available. Please authenticate first by visiting /oauth/login"
-                print(f"❌ {error_message}")
+                logger.error(error_message)
                 return error_message
             
-            # Get the email message
-            message = gmail_service.users().messages().get(
-                userId='me', 
-                id=email_id, 
-                format=format
-            ).execute()
+            # The body is only returned with the full format
+            if include_body and format == "metadata":
+                format = "full"
+            metadata_headers = READ_HEADERS if format == "metadata" else None
+            
+            # Get the email message, reusing an earlier header-only fetch when possible
+            cacheable = format == "metadata"
+            cache_key = _message_cache_key(email_id, format, metadata_headers)
+            message = _get_cached_message(cache_key) if cacheable else None
+            if message is None:
+                message = gmail_service.users().messages().get(
+                    userId='me', 
+                    id=email_id, 
+                    format=format,
+                    metadataHeaders=metadata_headers,
+                    fields=METADATA_FIELDS if cacheable else None
+                ).execute()
+                if cacheable:
+                    _cache_message(cache_key, message)
             
             # Parse the message
-            if format == "full":
+            if format in ("full", "metadata"):
                 headers = parse_email_headers(message['payload']['headers'])
-                body = extract_email_body(message['payload'])
                 
                 formatted_email = f"""
 Email ID: {email_id}
@@ -179,26 +435,28 @@ From: {headers.get('From', 'Unknown')}
 To: {headers.get('To', 'Unknown')}
 Subject: {headers.get('Subject', 'No Subject')}
 Date: {headers.get('Date', 'Unknown')}
-
-Body:
-{body}
                 """.strip()
                 
+                # Only decode the body when it was asked for
+                if include_body and format == "full":
+                    body = extract_email_body(message['payload'])
+                    formatted_email += f"\n\nBody:\n{body}"
+                
                 return formatted_email
             else:
-                return json.dumps(message, indent=2)
+                return orjson.dumps(message, option=orjson.OPT_INDENT_2).decode()
             
         except HttpError as error:
             error_message = f"An error occurred while reading email: {error}"
-            print(f"❌ {error_message}")
+            logger.error(error_message)
             return error_message
         except Exception as e:
             error_message = f"An unexpected error occurred: {str(e)}"
-            print(f"❌ {error_message}")
+            logger.error(error_message)
             return error_message
 
-    async def _arun(self, email_id: str, format: str = "full"):
-        return self._run(email_id, format)
+    async def _arun(self, email_id: str, format: str = "metadata", include_body: bool = False):
+        return await asyncio.to_thread(self._run, email_id, format, include_body)
 
 
 class SearchGmailTool(BaseTool):
@@ -212,7 +470,7 @@ class SearchGmailTool(BaseTool):
             gmail_service = get_gmail_service()
             if gmail_service is None:
                 error_message = "Gmail service is not available. Please authenticate first by visiting /oauth/login"
-                print(f"❌ {error_message}")
+                logger.error(error_message)
                 return error_message
             
             # Search for messages
@@ -220,7 +478,8 @@ class SearchGmailTool(BaseTool):
                 userId='me',
                 q=query,
                 maxResults=max_results,
-                includeSpamTrash=include_spam_trash
+                includeSpamTrash=include_spam_trash,
+                fields=LIST_FIELDS
             ).execute()
             
             messages = results.get('messages', [])
@@ -228,46 +487,53 @@ class SearchGmailTool(BaseTool):
             if not messages:
                 return f"No emails found matching query: '{query}'"
             
-            # Get details for each message
-            email_list = []
-            for msg in messages:
-                message = gmail_service.users().messages().get(
-                    userId='me', 
-                    id=msg['id'], 
-                    format='metadata'
-                ).execute()
-                
-                headers = parse_email_headers(message['payload']['headers'])
-                
-                email_info = {
-                    "id": msg['id'],
-                    "from": headers.get('From', 'Unknown'),
-                    "subject": headers.get('Subject', 'No Subject'),
-                    "date": headers.get('Date', 'Unknown')
-                }
-                email_list.append(email_info)
-            
-            # Format the results
-            formatted_results = f"Found {len(email_list)} emails matching '{query}':\n\n"
-            for i, email in enumerate(email_list, 1):
-                formatted_results += f"{i}. ID: {email['id']}\n"
-                formatted_results += f"   From: {email['from']}\n"
-                formatted_results += f"   Subject: {email['subject']}\n"
-                formatted_results += f"   Date: {email['date']}\n\n"
+            # Get details for all messages in a single batch
+            metadata = _fetch_metadata(gmail_service, [msg['id'] for msg in messages])
+            email_list = [_summarize_message(message) for message in metadata]
             
-            return formatted_results
+            return _format_email_list(f"Found {len(email_list)} emails matching '{query}':", email_list)
             
         except HttpError as error:
             error_message = f"An error occurred while searching emails: {error}"
-            print(f"❌ {error_message}")
+            logger.error(error_message)
             return error_message
         except Exception as e:
             error_message = f"An unexpected error occurred: {str(e)}"
-            print(f"❌ {error_message}")
+            logger.error(error_message)
             return error_message
 
     async def _arun(self, query: str, max_results: int = 10, include_spam_trash: bool = False):
-        return self._run(query, max_results, include_spam_trash)
+        try:
+            # Get current credentials without blocking the event loop
+            creds = await asyncio.to_thread(authenticate_google_api, GMAIL_SCOPES)
+            if creds is None:
+                error_message = "Gmail service is not available. Please authenticate first by visiting /oauth/login"
+                logger.error(error_message)
+                return error_message
+            
+            async with httpx.AsyncClient(http2=True, timeout=30) as client:
+                # Search for messages
+                results = await _list_messages(client, creds, q=query, maxResults=max_results,
+                                               includeSpamTrash=include_spam_trash)
+                messages = results.get('messages', [])
+                
+                if not messages:
+                    return f"No emails found matching query: '{query}'"
+                
+                # Get details for all messages concurrently over one HTTP/2 connection
+                metadata = await _get_messages(client, creds, [msg['id'] for msg in messages])
+            email_list = [_summarize_message(message) for message in metadata]
+            
+            return _format_email_list(f"Found {len(email_list)} emails matching '{query}':", email_list)
+            
+        except httpx.HTTPError as error:
+            error_message = f"An error occurred while searching emails: {error}"
+            logger.error(error_message)
+            return error_message
+        except Exception as e:
+            error_message = f"An unexpected error occurred: {str(e)}"
+            logger.error(error_message)
+            return error_message
 
 
 class ListGmailTool(BaseTool):
@@ -282,7 +548,7 @@ class ListGmailTool(BaseTool):
             gmail_service = get_gmail_service()
             if gmail_service is None:
                 error_message = "Gmail service is not available. Please authenticate first by visiting /oauth/login"
-                print(f"❌ {error_message}")
+                logger.error(error_message)
                 return error_message
             
             # Set default label to INBOX if none provided
@@ -294,7 +560,8 @@ class ListGmailTool(BaseTool):
                 userId='me',
                 labelIds=label_ids,
                 maxResults=max_results,
-                q=query
+                q=query,
+                fields=LIST_FIELDS
             ).execute()
             
             messages = results.get('messages', [])
@@ -302,44 +569,54 @@ class ListGmailTool(BaseTool):
             if not messages:
                 return "No emails found in the specified criteria."
             
-            # Get details for each message
-            email_list = []
-            for msg in messages:
-                message = gmail_service.users().messages().get(
-                    userId='me', 
-                    id=msg['id'], 
-                    format='metadata'
-                ).execute()
-                
-                headers = parse_email_headers(message['payload']['headers'])
-                
-                email_info = {
-                    "id": msg['id'],
-                    "from": headers.get('From', 'Unknown'),
-                    "subject": headers.get('Subject', 'No Subject'),
-                    "date": headers.get('Date', 'Unknown')
-                }
-                email_list.append(email_info)
-            
-            # Format the results
-            formatted_results = f"Recent {len(email_list)} emails:\n\n"
-            for i, email in enumerate(email_list, 1):
-                formatted_results += f"{i}. ID: {email['id']}\n"
-                formatted_results += f"   From: {email['from']}\n"
-                formatted_results += f"   Subject: {email['subject']}\n"
-                formatted_results += f"   Date: {email['date']}\n\n"
+            # Get details for all messages in a single batch
+            metadata = _fetch_metadata(gmail_service, [msg['id'] for msg in messages])
+            email_list = [_summarize_message(message) for message in metadata]
             
-            return formatted_results
+            return _format_email_list(f"Recent {len(email_list)} emails:", email_list)
             
         except HttpError as error:
             error_message = f"An error occurred while listing emails: {error}"
-            print(f"❌ {error_message}")
+            logger.error(error_message)
             return error_message
         except Exception as e:
             error_message = f"An unexpected error occurred: {str(e)}"
-            print(f"❌ {error_message}")
+            logger.error(error_message)
             return error_message
 
     async def _arun(self, max_results: int = 10, label_ids: Optional[List[str]] = None, 
                     query: Optional[str] = None):
-        return self._run(max_results, label_ids, query)
\ No newline at end of file
+        try:
+            # Get current credentials without blocking the event loop
+            creds = await asyncio.to_thread(authenticate_google_api, GMAIL_SCOPES)
+            if creds is None:
+                error_message = "Gmail service is not available. Please authenticate first by visiting /oauth/login"
+                logger.error(error_message)
+                return error_message
+            
+            # Set default label to INBOX if none provided
+            if label_ids is None:
+                label_ids = ['INBOX']
+            
+            async with httpx.AsyncClient(http2=True, timeout=30) as client:
+                # List messages
+                results = await _list_messages(client, creds, labelIds=label_ids, maxResults=max_results, q=query)
+                messages = results.get('messages', [])
+                
+                if not messages:
+                    return "No emails found in the specified criteria."
+                
+                # Get details for all messages concurrently over one HTTP/2 connection
+                metadata = await _get_messages(client, creds, [msg['id'] for msg in messages])
+            email_list = [_summarize_message(message) for message in metadata]
+            
+            return _format_email_list(f"Recent {len(email_list)} emails:", email_list)
+            
+        except httpx.HTTPError as error:
+            error_message = f"An error occurred while listing emails: {error}"
+            logger.error(error_message)
+            return error_message
+        except Exception as e:
+            error_message = f"An unexpected error occurred: {str(e)}"
+            logger.error(error_message)
+            return error_message
\ No newline at end of file
@@ -3,10 +3,25 @@
 from google_auth_oauthlib.flow import Flow
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
+import google_auth_httplib2
+import httplib2
+import logging
 import os
-import json
+import threading
+import orjson
+from functools import lru_cache
 from typing import Optional, List
 
+logger = logging.getLogger(__name__)
+
+# Serializes token.json writes from the request path and background saves
+_SAVE_LOCK = threading.Lock()
+
+# Serializes refreshes of the shared cached credentials
+_REFRESH_LOCK = threading.Lock()
+
 # Define scopes for different Google services
 DOCS_SCOPES = ['https://www.googleapis.com/auth/documents', 'https://www.googleapis.com/auth/drive.readonly']
 GMAIL_SCOPES = ['https://www.googleapis.com/auth/gmail.send', 'https://www.googleapis.com/auth/gmail.readonly']
@@ -19,10 +34,102 @@ def get_credentials_path():
     """Get the path to the credentials file"""
     return os.path.join(os.path.dirname(os.path.dirname(__file__)), 'token.json')
 
+@lru_cache(maxsize=1)
 def get_client_secrets_path():
     """Get the path to the client secrets file"""
     return os.path.join(os.path.dirname(os.path.dirname(__file__)), 'client_secret.json')
 
+@lru_cache(maxsize=1)
+def load_client_config() -> dict:
+    """Load and cache the parsed OAuth client secrets"""
+    with open(get_client_secrets_path(), 'rb') as f:
+        return orjson.loads(f.read())
+
+# Retries (with exponential backoff) for 429/5xx and connection errors.
+# POST is left out since a retried send or append could run twice.
+API_NUM_RETRIES = 3
+_RETRYABLE_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE'})
+
+# One persistent httplib2.Http per thread, so TLS connections are kept alive
+# between requests without sharing a non-thread-safe transport
+_THREAD_HTTP = threading.local()
+
+def _get_thread_http() -> httplib2.Http:
+    """Get this thread's pooled HTTP transport, creating it on first use"""
+    http = getattr(_THREAD_HTTP, 'http', None)
+    if http is None:
+        http = _THREAD_HTTP.http = httplib2.Http(timeout=60)
+    return http
+
+class _RetryingHttpRequest(HttpRequest):
+    """HttpRequest that retries idempotent calls by default"""
+    
+    def execute(self, http=None, num_retries=None):
+        if num_retries is None:
+            num_retries = API_NUM_RETRIES if self.method in _RETRYABLE_METHODS else 0
+        return super().execute(http=http, num_retries=num_retries)
+
+def build_request(http, *args, **kwargs):
+    """
+    Request builder for googleapiclient services shared across threads
+    
+    httplib2 is not thread-safe, so each request is authorized over the
+    calling thread's own keep-alive transport instead of the one the
+    service was built with.
+    """
+    new_http = google_auth_httplib2.AuthorizedHttp(http.credentials, http=_get_thread_http())
+    return _RetryingHttpRequest(new_http, *args, **kwargs)
+
+# Built services, keyed by (api, version, scope set) and reused while they
+# were built from the current stored credentials
+_SERVICE_CACHE = {}
+_SERVICE_LOCK = threading.Lock()
+
+def get_cached_service(api: str, version: str, scopes: List[str]):
+    """
+    Get a service for the API, rebuilding it only when the credentials change
+    
+    Loading the credentials is cheap (a stat and a memo hit) and picks up a
+    re-login's new token.json, since the memoized credentials object only
+    changes when the file does.
+    
+    Returns:
+        The service, or None when there are no stored credentials
+    """
+    key = (api, version, frozenset(scopes))
+    creds = authenticate_google_api(scopes)
+    with _SERVICE_LOCK:
+        cached = _SERVICE_CACHE.get(key)
+        if cached and creds is cached[1]:
+            return cached[0]
+        
+        if creds:
+            # Build from the discovery document bundled with google-api-python-client
+            service = build(
+                api, version,
+                credentials=creds,
+                requestBuilder=build_request,
+                static_discovery=True,
+                cache_discovery=False
+            )
+            _SERVICE_CACHE[key] = (service, creds)
+            return service
+        
+        _SERVICE_CACHE.pop(key, None)
+        return None
+
+@lru_cache(maxsize=8)
+def _load_creds(mtime_ns: int, scopes: frozenset) -> Credentials:
+    """
+    Load credentials from token.json for one (mtime, scope set) pair
+    
+    The file is only read again once its mtime changes, so a stable
+    token.json costs no disk I/O across tool calls.
+    """
+    with open(get_credentials_path(), 'rb') as token_file:
+        creds_data = orjson.loads(token_file.read())
+    return Credentials.from_authorized_user_info(creds_data, sorted(scopes))
+
 def get_stored_credentials(scopes: List[str]) -> Optional[Credentials]:
     """
     Get stored credentials if they exist and are valid
@@ -35,13 +142,13 @@ def get_stored_credentials(scopes: List[str]) -> Optional[Credentials]:
     """
     token_path = get_credentials_path()
     
-    if not os.path.exists(token_path):
+    try:
+        st = os.stat(token_path)
+    except FileNotFoundError:
         return None
         
     try:
-        with open(token_path, 'r') as token_file:
-            creds_data = json.load(token_file)
-            creds = Credentials.from_authorized_user_info(creds_data, scopes)
+        creds = _load_creds(st.st_mtime_ns, frozenset(scopes))
             
         # Check if credentials are valid
         if creds and creds.valid:
@@ -50,25 +157,54 @@ def get_stored_credentials(scopes: List[str]) -> Optional[Credentials]:
         # Try to refresh if expired
         if creds and creds.expired and creds.refresh_token:
             try:
-                creds.refresh(Request())
-                # Save refreshed credentials
-                save_credentials(creds)
+                refresh_credentials(creds)
                 return creds
             except Exception as e:
-                print(f"Failed to refresh credentials: {e}")
+                logger.error("Failed to refresh credentials: %s", e)
                 return None
                 
     except Exception as e:
-        print(f"Error loading stored credentials: {e}")
+        logger.error("Error loading stored credentials: %s", e)
         return None
     
     return None
 
+def refresh_credentials(creds: Credentials, rejected_token: Optional[str] = None):
+    """
+    Refresh credentials in place, one refresh at a time across threads
+    
+    Args:
+        creds: Credentials to refresh (usually the shared cached object)
+        rejected_token: Access token the API rejected with a 401; without it,
+            credentials that are still valid are left as they are
+    """
+    with _REFRESH_LOCK:
+        # Another caller may have refreshed these shared credentials while we waited
+        if rejected_token is None:
+            if creds.valid:
+                return
+        elif creds.token != rejected_token:
+            return
+        old_token = creds.token
+        creds.refresh(Request())
+    
+    # Save refreshed credentials in the background, and only if the
+    # token actually rotated; the caller already holds it in memory
+    if creds.token != old_token:
+        threading.Thread(target=save_credentials, args=(creds,), daemon=True).start()
+
 def save_credentials(creds: Credentials):
-    """Save credentials to file"""
+    """Save credentials to file, atomically replacing any existing token"""
     token_path = get_credentials_path()
-    with open(token_path, 'w') as token_file:
-        token_file.write(creds.to_json())
+    tmp_path = token_path + '.tmp'
+    try:
+        with _SAVE_LOCK:
+            with open(tmp_path, 'w') as token_file:
+                token_file.write(creds.to_json())
+            os.replace(tmp_path, token_path)
+    except Exception as e:
+        logger.error("Failed to save credentials: %s", e)
+        raise
 
 def create_oauth_flow(scopes: List[str], redirect_uri: str = 'http://localhost:8080/'):
     """
@@ -81,10 +217,9 @@ def create_oauth_flow(scopes: List[str], redirect_uri: str = 'http://localhost:8
     Returns:
         OAuth flow object
     """
-    client_secrets_path = get_client_secrets_path()
-    
-    flow = Flow.from_client_secrets_file(
-        client_secrets_path,
+    # Build from the cached client config instead of re-reading the secrets file
+    flow = Flow.from_client_config(
+        load_client_config(),
         scopes=scopes
     )
     flow.redirect_uri = redirect_uri
@@ -109,11 +244,11 @@ def authenticate_google_api(scopes: List[str]) -> Optional[Credentials]:
             
         # If no valid stored credentials, return None
         # The frontend will need to initiate the OAuth flow
-        print("No valid credentials found. OAuth flow needs to be initiated.")
+        logger.info("No valid credentials found. OAuth flow needs to be initiated.")
         return None
         
     except Exception as e:
-        print(f"❌ Authentication error: {str(e)}")
+        logger.error("Authentication error: %s", e)
         return None
 
 def is_authenticated(scopes: List[str] = None) -> bool:
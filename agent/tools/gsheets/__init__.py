@@ -9,5 +9,7 @@ from .gsheets_tools import (
     ReadGoogleSheetTool,
     UpdateGoogleSheetTool,
     AddRowGoogleSheetTool,
+    BatchUpdateGoogleSheetTool,
+    BatchReadGoogleSheetsTool,
     SearchGoogleSheetsTool
 )
\ No newline at end of file
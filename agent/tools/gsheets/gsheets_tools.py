@@ -2,24 +2,20 @@
 
 from langchain.tools import BaseTool
 from pydantic import BaseModel, Field
-from typing import Optional, Type, List, Dict, Any
-from googleapiclient.discovery import build
+from typing import Optional, Type, List, Dict, Any, Tuple
 from googleapiclient.errors import HttpError
+import httpx
+import asyncio
+import csv
+import io
 
 # Import the authentication module
-from ..google_auth import authenticate_google_api, SHEETS_SCOPES
-
-# Google Sheets services will be initialized per request
-sheets_service = None
-drive_service = None
+from ..google_auth import authenticate_google_api, get_cached_service, refresh_credentials, SHEETS_SCOPES
 
 def get_sheets_service():
     """Get Google Sheets service with current credentials"""
     try:
-        creds = authenticate_google_api(SHEETS_SCOPES)
-        if creds:
-            return build('sheets', 'v4', credentials=creds)
-        return None
+        return get_cached_service('sheets', 'v4', SHEETS_SCOPES)
     except Exception as e:
         print(f"❌ Failed to initialize Google Sheets service: {str(e)}")
         return None
@@ -27,14 +23,144 @@ def get_sheets_service():
 def get_drive_service():
     """Get Google Drive service with current credentials"""
     try:
-        creds = authenticate_google_api(SHEETS_SCOPES)
-        if creds:
-            return build('drive', 'v3', credentials=creds)
-        return None
+        return get_cached_service('drive', 'v3', SHEETS_SCOPES)
     except Exception as e:
         print(f"❌ Failed to initialize Google Drive service: {str(e)}")
         return None
 
+# Only the spreadsheet title and displayed cell values are needed for reads
+READ_GRID_FIELDS = 'properties.title,sheets.data.rowData.values.formattedValue'
+
+def _grid_to_values(spreadsheet):
+    """Convert grid data from spreadsheets.get into a values-style 2D list"""
+    values = []
+    for sheet in spreadsheet.get('sheets', []):
+        for grid in sheet.get('data', []):
+            for row in grid.get('rowData', []):
+                cells = [cell.get('formattedValue', '') for cell in row.get('values', [])]
+                # Trim trailing blanks the way values.get does
+                while cells and cells[-1] == '':
+                    cells.pop()
+                values.append(cells)
+    while values and not values[-1]:
+        values.pop()
+    return values
+
+def _format_values(values, include_headers):
+    """Format a 2D list of cell values as a text table"""
+    # Stringify every cell once, for both width calculation and output
+    sv = [[str(cell) for cell in row] for row in values]
+    
+    # Format as a table
+    if include_headers and len(sv) > 1:
+        ncols = max(map(len, sv))
+        
+        # Pad short rows once so every row has a cell per column
+        for row in sv:
+            if len(row) < ncols:
+                row.extend([""] * (ncols - len(row)))
+        
+        # Calculate column widths
+        col_widths = [max(map(len, column)) for column in zip(*sv)]
+        
+        lines = [" | ".join([f"{cell:<{width}}" for cell, width in zip(row, col_widths)])
+                 for row in sv]
+        
+        # Underline the header row
+        lines.insert(1, "-" * len(lines[0]))
+    else:
+        # Just print all rows
+        lines = [" | ".join(row) for row in sv]
+    
+    return "\n".join(lines) + "\n"
+
+def _parse_raw_table(raw_text):
+    """Parse pasted comma- or tab-separated text into rows of cells"""
+    raw_text = raw_text.strip()
+    try:
+        # Detect the delimiter from a sample rather than re-scanning every line
+        dialect = csv.Sniffer().sniff(raw_text[:2048], delimiters=',\t')
+    except csv.Error:
+        # No consistent delimiter (e.g. a single column)
+        dialect = csv.excel
+    return list(csv.reader(io.StringIO(raw_text), dialect))
+
+class SheetsBatch:
+    """
+    Accumulates value writes for one spreadsheet and sends them together
+    in a single values.batchUpdate call.
+    """
+    
+    def __init__(self, service, spreadsheet_id: str, value_input_option: str = "USER_ENTERED"):
+        self.service = service
+        self.spreadsheet_id = spreadsheet_id
+        self.value_input_option = value_input_option
+        self.data = []
+    
+    def add(self, range: str, values: List[List[Any]]):
+        """Queue a write of values to a range"""
+        self.data.append({'range': range, 'values': values})
+    
+    def flush(self) -> Dict[str, Any]:
+        """Send all queued writes in one request and clear the queue"""
+        if not self.data:
+            return {}
+        result = self.service.spreadsheets().values().batchUpdate(
+            spreadsheetId=self.spreadsheet_id,
+            body={
+                'valueInputOption': self.value_input_option,
+                'data': self.data
+            }
+        ).execute()
+        self.data = []
+        return result
+
+# Async Sheets REST access for reading several spreadsheets at once
+SHEETS_API_URL = 'https://sheets.googleapis.com/v4/spreadsheets'
+
+# Upper bound on concurrent Sheets requests, to stay within per-user quota
+SHEETS_MAX_CONCURRENCY = 5
+
+async def batch_read(creds, pairs: List[Tuple[str, List[str]]]) -> List[Dict[str, Any]]:
+    """
+    Read ranges from several spreadsheets concurrently
+    
+    Issues one values.batchGet per spreadsheet over a shared HTTP/2 client.
+    
+    Args:
+        creds: Google OAuth credentials with Sheets access
+        pairs: (spreadsheet_id, ranges) for each spreadsheet to read
+        
+    Returns:
+        batchGet responses in the same order as ``pairs``
+    """
+    semaphore = asyncio.Semaphore(SHEETS_MAX_CONCURRENCY)
+    
+    async with httpx.AsyncClient(http2=True, timeout=30) as client:
+        async def _batch_get(spreadsheet_id, ranges):
+            url = f"{SHEETS_API_URL}/{spreadsheet_id}/values:batchGet"
+            async with semaphore:
+                token = creds.token
+                response = await client.get(url, params={'ranges': ranges},
+                                            headers={'Authorization': f'Bearer {token}'})
+                if response.status_code == 401 and creds.refresh_token:
+                    # Only the first request to see the stale token refreshes it, and the new token is saved
+                    await asyncio.to_thread(refresh_credentials, creds, token)
+                    response = await client.get(url, params={'ranges': ranges},
+                                                headers={'Authorization': f'Bearer {creds.token}'})
+                response.raise_for_status()
+                return response.json()
+        
+        return await asyncio.gather(*[_batch_get(spreadsheet_id, ranges) for spreadsheet_id, ranges in pairs])
+
+# Drive query for spreadsheets whose name contains a quoted search term
+_SEARCH_QUERY_TMPL = "name contains {q} and mimeType='application/vnd.google-apps.spreadsheet'"
+SEARCH_FIELDS = 'files(id,name,createdTime,modifiedTime,webViewLink),nextPageToken'
+
+def _quote_query_term(term: str) -> str:
+    """Quote a term for a Drive query, escaping backslashes and single quotes"""
+    return "'" + term.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
 # Tool Input Schemas
 class CreateSheetInput(BaseModel):
     title: str = Field(description="Title of the new spreadsheet")
@@ -44,6 +170,7 @@ class ReadSheetInput(BaseModel):
     spreadsheet_id: str = Field(description="ID of the Google Spreadsheet to read")
     range: str = Field(description="Range to read in A1 notation, e.g., 'Sheet1!A1:D10'")
     include_headers: bool = Field(True, description="Whether to include headers in the response")
+    ranges: Optional[List[str]] = Field(None, description="Additional ranges to read in the same request, in A1 notation")
 
 class UpdateSheetInput(BaseModel):
     spreadsheet_id: str = Field(description="ID of the Google Spreadsheet to update")
@@ -56,6 +183,22 @@ class AddRowInput(BaseModel):
     sheet_name: str = Field(description="Name of the sheet to add a row to")
     values: List[Any] = Field(description="Values to add as a new row")
 
+class RangeUpdate(BaseModel):
+    range: str = Field(description="Range to update in A1 notation, e.g., 'Sheet1!A1'")
+    values: List[List[Any]] = Field(description="Values to write to the range as a 2D array")
+
+class BatchUpdateSheetInput(BaseModel):
+    spreadsheet_id: str = Field(description="ID of the Google Spreadsheet to update")
+    updates: List[RangeUpdate] = Field(description="Range updates to apply together in one request")
+
+class SheetRanges(BaseModel):
+    spreadsheet_id: str = Field(description="ID of the Google Spreadsheet to read")
+    ranges: List[str] = Field(description="Ranges to read in A1 notation, e.g., ['Sheet1!A1:D10']")
+
+class BatchReadSheetsInput(BaseModel):
+    reads: List[SheetRanges] = Field(description="Spreadsheets and the ranges to read from each")
+    include_headers: bool = Field(True, description="Whether to include headers in the response")
+
 class SearchSheetsInput(BaseModel):
     query: str = Field(description="Search query to find spreadsheets")
     max_results: int = Field(10, description="Maximum number of results to return")
@@ -82,21 +225,19 @@ class CreateGoogleSheetTool(BaseTool):
                     "properties": {"title": "Sheet1"}
                 }]
             }
-            spreadsheet = sheets_service.spreadsheets().create(body=spreadsheet_body).execute()
-            spreadsheet_id = spreadsheet['spreadsheetId']
-
-            # Add headers if provided
+            
+            # Add headers if provided, as the first row of the new sheet
             if headers:
-                values = [headers]
-                body = {
-                    'values': values
-                }
-                sheets_service.spreadsheets().values().update(
-                    spreadsheetId=spreadsheet_id,
-                    range="Sheet1!A1",
-                    valueInputOption="RAW",
-                    body=body
-                ).execute()
+                spreadsheet_body["sheets"][0]["data"] = [{
+                    "startRow": 0,
+                    "startColumn": 0,
+                    "rowData": [{
+                        "values": [{"userEnteredValue": {"stringValue": str(header)}} for header in headers]
+                    }]
+                }]
+            
+            spreadsheet = sheets_service.spreadsheets().create(body=spreadsheet_body, fields='spreadsheetId').execute()
+            spreadsheet_id = spreadsheet['spreadsheetId']
             
             print(f"📊 Created spreadsheet: {title} (ID: {spreadsheet_id})")
             return f"Spreadsheet created successfully. ID: {spreadsheet_id}, Title: {title}"
@@ -110,7 +251,7 @@ class CreateGoogleSheetTool(BaseTool):
             return error_message
 
     async def _arun(self, title: str, headers: Optional[List[str]] = None):
-        return self._run(title, headers)
+        return await asyncio.to_thread(self._run, title, headers)
 
 
 # Read Spreadsheet tool
@@ -119,7 +260,8 @@ class ReadGoogleSheetTool(BaseTool):
     description: str = "Reads content from an existing Google Spreadsheet"
     args_schema: Type[BaseModel] = ReadSheetInput
 
-    def _run(self, spreadsheet_id: str, range: str, include_headers: bool = True):
+    def _run(self, spreadsheet_id: str, range: str, include_headers: bool = True,
+             ranges: Optional[List[str]] = None):
         try:
             # Get sheets service with current credentials
             sheets_service = get_sheets_service()
@@ -127,55 +269,45 @@ class ReadGoogleSheetTool(BaseTool):
                 error_message = "Google Sheets service is not available. Please authenticate first by visiting /oauth/login"
                 print(f"❌ {error_message}")
                 return error_message
-                
-            # Get the spreadsheet content
-            result = sheets_service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range=range
-            ).execute()
-            
-            values = result.get('values', [])
             
-            if not values:
-                return "No data found in the specified range."
-            
-            # Format the data for better readability
-            formatted_data = ""
-            
-            # Get spreadsheet info
-            spreadsheet = sheets_service.spreadsheets().get(
-                spreadsheetId=spreadsheet_id
-            ).execute()
-            
-            spreadsheet_title = spreadsheet.get('properties', {}).get('title', 'Untitled')
-            formatted_data += f"Spreadsheet: {spreadsheet_title}\n"
-            formatted_data += f"Range: {range}\n\n"
-            
-            # Format as a table
-            if include_headers and len(values) > 1:
-                headers = values[0]
-                data_rows = values[1:]
-                
-                # Calculate column widths
-                col_widths = [max(len(str(row[i])) if i < len(row) else 0 for row in values) 
-                             for i in range(max(len(row) for row in values))]
+            if ranges:
+                # Read every range in one batchGet, then fetch just the title
+                result = sheets_service.spreadsheets().values().batchGet(
+                    spreadsheetId=spreadsheet_id,
+                    ranges=[range] + list(ranges)
+                ).execute()
+                value_ranges = [(vr.get('range', ''), vr.get('values', []))
+                                for vr in result.get('valueRanges', [])]
                 
-                # Print headers
-                header_row = " | ".join(str(headers[i]).ljust(col_widths[i]) if i < len(headers) else "".ljust(col_widths[i]) 
-                                      for i in range(len(col_widths)))
-                formatted_data += header_row + "\n"
-                formatted_data += "-" * len(header_row) + "\n"
+                if not any(values for _, values in value_ranges):
+                    return "No data found in the specified range."
                 
-                # Print data rows
-                for row in data_rows:
-                    formatted_data += " | ".join(str(row[i]).ljust(col_widths[i]) if i < len(row) else "".ljust(col_widths[i]) 
-                                              for i in range(len(col_widths))) + "\n"
+                spreadsheet = sheets_service.spreadsheets().get(
+                    spreadsheetId=spreadsheet_id,
+                    fields='properties.title'
+                ).execute()
             else:
-                # Just print all rows
-                for row in values:
-                    formatted_data += " | ".join(str(cell) for cell in row) + "\n"
+                # Get the title and cell values in a single request
+                spreadsheet = sheets_service.spreadsheets().get(
+                    spreadsheetId=spreadsheet_id,
+                    ranges=[range],
+                    includeGridData=True,
+                    fields=READ_GRID_FIELDS
+                ).execute()
+                value_ranges = [(range, _grid_to_values(spreadsheet))]
+                
+                if not value_ranges[0][1]:
+                    return "No data found in the specified range."
+            
+            # Format the data for better readability, one section per range
+            spreadsheet_title = spreadsheet.get('properties', {}).get('title', 'Untitled')
+            sections = [
+                f"Range: {value_range}\n\n"
+                + (_format_values(values, include_headers) if values else "No data found in the specified range.\n")
+                for value_range, values in value_ranges
+            ]
             
-            return formatted_data
+            return f"Spreadsheet: {spreadsheet_title}\n" + "\n".join(sections)
         except HttpError as error:
             error_message = f"An error occurred while reading the spreadsheet: {error}"
             print(f"❌ {error_message}")
@@ -185,8 +317,9 @@ class ReadGoogleSheetTool(BaseTool):
             print(f"❌ {error_message}")
             return error_message
 
-    async def _arun(self, spreadsheet_id: str, range: str, include_headers: bool = True):
-        return self._run(spreadsheet_id, range, include_headers)
+    async def _arun(self, spreadsheet_id: str, range: str, include_headers: bool = True,
+                    ranges: Optional[List[str]] = None):
+        return await asyncio.to_thread(self._run, spreadsheet_id, range, include_headers, ranges)
 
 
 # Update Spreadsheet tool
@@ -209,16 +342,7 @@ class UpdateGoogleSheetTool(BaseTool):
                 # This is likely a raw text input that needs to be parsed
                 raw_text = values[0][0]
                 if isinstance(raw_text, str):
-                    # Split by newlines and then by commas or tabs
-                    processed_values = []
-                    for line in raw_text.strip().split('\n'):
-                        if ',' in line:
-                            processed_values.append(line.split(','))
-                        elif '\t' in line:
-                            processed_values.append(line.split('\t'))
-                        else:
-                            processed_values.append([line])
-                    values = processed_values
+                    values = _parse_raw_table(raw_text)
             
             body = {
                 'values': values
@@ -244,7 +368,7 @@ class UpdateGoogleSheetTool(BaseTool):
             return error_message
 
     async def _arun(self, spreadsheet_id: str, range: str, values: List[List[Any]], raw_input: bool = False):
-        return self._run(spreadsheet_id, range, values, raw_input)
+        return await asyncio.to_thread(self._run, spreadsheet_id, range, values, raw_input)
 
 
 # Add Row to Spreadsheet tool
@@ -262,29 +386,21 @@ class AddRowGoogleSheetTool(BaseTool):
                 print(f"❌ {error_message}")
                 return error_message
             
-            # Get the current data to determine where to add the new row
-            result = sheets_service.spreadsheets().values().get(
-                spreadsheetId=spreadsheet_id,
-                range=f"{sheet_name}"
-            ).execute()
-            
-            current_values = result.get('values', [])
-            next_row = len(current_values) + 1  # Add to the next available row
-            
             # Prepare the values for the new row
             body = {
                 'values': [values]  # Wrap in a list to make it a row
             }
             
-            # Update the spreadsheet with the new row
-            result = sheets_service.spreadsheets().values().update(
+            # Append after the last row of data; Sheets picks the row server-side
+            result = sheets_service.spreadsheets().values().append(
                 spreadsheetId=spreadsheet_id,
-                range=f"{sheet_name}!A{next_row}",
+                range=sheet_name,
                 valueInputOption="USER_ENTERED",
+                insertDataOption="INSERT_ROWS",
                 body=body
             ).execute()
             
-            updated_cells = result.get('updatedCells', 0)
+            updated_cells = result.get('updates', {}).get('updatedCells', 0)
             print(f"➕ Added new row to spreadsheet {spreadsheet_id}, sheet {sheet_name}")
             return f"Successfully added a new row with {updated_cells} cells to sheet {sheet_name}."
         except HttpError as error:
@@ -297,7 +413,97 @@ class AddRowGoogleSheetTool(BaseTool):
             return error_message
 
     async def _arun(self, spreadsheet_id: str, sheet_name: str, values: List[Any]):
-        return self._run(spreadsheet_id, sheet_name, values)
+        return await asyncio.to_thread(self._run, spreadsheet_id, sheet_name, values)
+
+
+# Batch Update Spreadsheet tool
+class BatchUpdateGoogleSheetTool(BaseTool):
+    name: str = "batch_update_google_sheet"
+    description: str = "Updates several ranges of an existing Google Spreadsheet in a single request"
+    args_schema: Type[BaseModel] = BatchUpdateSheetInput
+
+    def _run(self, spreadsheet_id: str, updates: List[Any]):
+        try:
+            # Get sheets service with current credentials
+            sheets_service = get_sheets_service()
+            if sheets_service is None:
+                error_message = "Google Sheets service is not available. Please authenticate first by visiting /oauth/login"
+                print(f"❌ {error_message}")
+                return error_message
+            
+            # Queue every range update and send them together
+            batch = SheetsBatch(sheets_service, spreadsheet_id)
+            for update in updates:
+                if isinstance(update, RangeUpdate):
+                    update = update.dict()
+                batch.add(update['range'], update['values'])
+            result = batch.flush()
+            
+            updated_cells = result.get('totalUpdatedCells', 0)
+            updated_ranges = len(result.get('responses', []))
+            print(f"📝 Updated {updated_cells} cells across {updated_ranges} ranges in spreadsheet {spreadsheet_id}")
+            return f"Successfully updated {updated_cells} cells across {updated_ranges} ranges."
+        except HttpError as error:
+            error_message = f"An error occurred while updating the spreadsheet: {error}"
+            print(f"❌ {error_message}")
+            return error_message
+        except Exception as e:
+            error_message = f"An unexpected error occurred: {str(e)}"
+            print(f"❌ {error_message}")
+            return error_message
+
+    async def _arun(self, spreadsheet_id: str, updates: List[Any]):
+        return await asyncio.to_thread(self._run, spreadsheet_id, updates)
+
+
+# Batch Read Spreadsheets tool
+class BatchReadGoogleSheetsTool(BaseTool):
+    name: str = "batch_read_google_sheets"
+    description: str = "Reads ranges from several Google Spreadsheets at once"
+    args_schema: Type[BaseModel] = BatchReadSheetsInput
+
+    def _run(self, reads: List[Any], include_headers: bool = True):
+        return asyncio.run(self._arun(reads, include_headers))
+
+    async def _arun(self, reads: List[Any], include_headers: bool = True):
+        try:
+            # Get current credentials without blocking the event loop
+            creds = await asyncio.to_thread(authenticate_google_api, SHEETS_SCOPES)
+            if creds is None:
+                error_message = "Google Sheets service is not available. Please authenticate first by visiting /oauth/login"
+                print(f"❌ {error_message}")
+                return error_message
+            
+            pairs = []
+            for read in reads:
+                if isinstance(read, SheetRanges):
+                    read = read.dict()
+                pairs.append((read['spreadsheet_id'], read['ranges']))
+            
+            results = await batch_read(creds, pairs)
+            
+            # Format each range of each spreadsheet as its own section
+            sections = []
+            for (spreadsheet_id, _), result in zip(pairs, results):
+                for value_range in result.get('valueRanges', []):
+                    values = value_range.get('values', [])
+                    sections.append(
+                        f"Spreadsheet ID: {spreadsheet_id}\nRange: {value_range.get('range', '')}\n\n"
+                        + (_format_values(values, include_headers) if values else "No data found in the specified range.\n")
+                    )
+            
+            if not sections:
+                return "No data found in the specified ranges."
+            
+            return "\n".join(sections)
+        except httpx.HTTPError as error:
+            error_message = f"An error occurred while reading the spreadsheets: {error}"
+            print(f"❌ {error_message}")
+            return error_message
+        except Exception as e:
+            error_message = f"An unexpected error occurred: {str(e)}"
+            print(f"❌ {error_message}")
+            return error_message
 
 
 # Search Google Sheets tool
@@ -315,31 +521,36 @@ class SearchGoogleSheetsTool(BaseTool):
                 print(f"❌ {error_message}")
                 return error_message
             
-            # Search for spreadsheets
-            query = f"name contains '{query}' and mimeType='application/vnd.google-apps.spreadsheet'"
-            results = drive_service.files().list(
-                q=query,
+            # Search for spreadsheets, paging only until max_results are collected
+            files = drive_service.files()
+            request = files.list(
+                q=_SEARCH_QUERY_TMPL.format(q=_quote_query_term(query)),
                 spaces='drive',
-                fields='files(id, name, createdTime, modifiedTime, webViewLink)',
+                fields=SEARCH_FIELDS,
                 pageSize=max_results
-            ).execute()
-            
-            items = results.get('files', [])
+            )
+            items = []
+            while request is not None and len(items) < max_results:
+                results = request.execute()
+                items.extend(results.get('files', []))
+                request = files.list_next(request, results)
+            items = items[:max_results]
             
             if not items:
                 return f"No spreadsheets found matching '{query}'."
             
             # Format the results
-            formatted_results = f"Found {len(items)} spreadsheet(s) matching '{query}':\n\n"
-            
-            for item in items:
-                formatted_results += f"Title: {item['name']}\n"
-                formatted_results += f"ID: {item['id']}\n"
-                formatted_results += f"Created: {item.get('createdTime', 'Unknown')}\n"
-                formatted_results += f"Last Modified: {item.get('modifiedTime', 'Unknown')}\n"
-                formatted_results += f"Link: {item.get('webViewLink', 'Not available')}\n\n"
+            parts = [f"Found {len(items)} spreadsheet(s) matching '{query}':\n\n"]
+            parts.extend(
+                f"Title: {item['name']}\n"
+                f"ID: {item['id']}\n"
+                f"Created: {item.get('createdTime', 'Unknown')}\n"
+                f"Last Modified: {item.get('modifiedTime', 'Unknown')}\n"
+                f"Link: {item.get('webViewLink', 'Not available')}\n\n"
+                for item in items
+            )
             
-            return formatted_results
+            return "".join(parts)
         except HttpError as error:
             error_message = f"An error occurred while searching for spreadsheets: {error}"
             print(f"❌ {error_message}")
@@ -350,4 +561,4 @@ class SearchGoogleSheetsTool(BaseTool):
             return error_message
 
     async def _arun(self, query: str, max_results: int = 10):
-        return self._run(query, max_results)
\ No newline at end of file
+        return await asyncio.to_thread(self._run, query, max_results)
\ No newline at end of file
@@ -1,23 +1,34 @@
 from fastapi import FastAPI, HTTPException, File, UploadFile, Request, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import RedirectResponse, JSONResponse, ORJSONResponse, StreamingResponse, HTMLResponse
+from starlette.concurrency import run_in_threadpool
 import os
 from dotenv import load_dotenv
-from groq import Groq
 from pathlib import Path
-from typing import List, Dict, Optional
+from functools import lru_cache, wraps
+import time
+from typing import AsyncIterator, BinaryIO, Callable, List, Dict, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
 from pydantic import BaseModel
 import shutil
-import json
+import tempfile
+import orjson
 import io
+import html
+import re
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from fastapi import File, UploadFile, HTTPException
 
 # Document parsing imports
-import PyPDF2
+import pypdfium2 as pdfium
+from pdf_text import extract_pages, extract_page_range
 from docx import Document
 
-# Import agent
-from agent import create_agent, AgentManager
+from semantic_cache import SemanticCache
 
 # Import OAuth utilities
 from agent.tools.google_auth import (
@@ -25,12 +36,14 @@ from agent.tools.google_auth import (
     save_credentials, 
     is_authenticated, 
     ALL_SCOPES,
-    get_stored_credentials
+    get_stored_credentials,
+    load_client_config
 )
 
 load_dotenv(dotenv_path=Path(__file__).resolve().parent / '.env')
 
-app = FastAPI()
+# orjson serializes responses (including datetimes) much faster than the stdlib encoder
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # CORS setup
 app.add_middleware(
@@ -41,48 +54,376 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses; LLM output is text and shrinks several times over
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Initialize Groq client
 groq_api_key = os.environ.get("GROQ_API_KEY")
 if not groq_api_key:
     raise RuntimeError("GROQ_API_KEY environment variable is not set")
-client = Groq(api_key=groq_api_key)
+
+@lru_cache(maxsize=1)
+def _async_groq():
+    """Create the async Groq client on first use"""
+    from groq import AsyncGroq
+    return AsyncGroq(api_key=groq_api_key)
+
+# Process-wide cap on Groq completion requests in flight. Requests over the
+# cap wait for a free slot instead of piling onto Groq and drawing 429s.
+GROQ_MAX_CONCURRENCY = int(os.environ.get("GROQ_MAX_CONCURRENCY", "8"))
+_GROQ_GATE = asyncio.Semaphore(GROQ_MAX_CONCURRENCY)
+
+async def _groq_completion(**params):
+    """Create a Groq chat completion once a concurrency slot is free"""
+    async with _GROQ_GATE:
+        return await _async_groq().chat.completions.create(**params)
+
+# Agent manager shared by all /agent requests, built on the first one
+_AGENT_MANAGER = None
+_AGENT_LOCK = asyncio.Lock()
+
+def _build_agent_manager():
+    """Create the agent manager, importing LangChain"""
+    from agent import AgentManager
+    return AgentManager()
+
+async def _get_agent_manager():
+    """Return the shared agent manager, building it once without blocking the event loop"""
+    global _AGENT_MANAGER
+    if _AGENT_MANAGER is None:
+        async with _AGENT_LOCK:
+            if _AGENT_MANAGER is None:
+                _AGENT_MANAGER = await run_in_threadpool(_build_agent_manager)
+    return _AGENT_MANAGER
+
+# Cached (authenticated, expiry) for /oauth/status; re-validated near expiry
+_auth_cache: Optional[Tuple[bool, Optional[datetime]]] = None
+AUTH_REVALIDATE_WINDOW = timedelta(minutes=5)
+
+def _refresh_auth_cache() -> Tuple[bool, Optional[datetime]]:
+    """Re-read the stored credentials and update the cached auth state"""
+    global _auth_cache
+    creds = get_stored_credentials(ALL_SCOPES)
+    _auth_cache = (creds is not None, creds.expiry if creds else None)
+    return _auth_cache
+
+def _ttl_cache(seconds: float):
+    """Cache a zero-argument function's result for the given number of seconds"""
+    def decorator(func):
+        state = {}
+        
+        @wraps(func)
+        def wrapper():
+            now = time.monotonic()
+            if 'value' in state and now - state['cached_at'] < seconds:
+                return state['value']
+            value = func()
+            state.update(value=value, cached_at=now)
+            return value
+        
+        wrapper.cache_clear = state.clear
+        return wrapper
+    return decorator
+
+@_ttl_cache(seconds=60)
+def _is_auth_cached() -> bool:
+    """is_authenticated(), re-checked at most once a minute"""
+    return is_authenticated()
+
+# Responses to recent history-free /chat prompts, matched by meaning
+_semantic_cache = SemanticCache()
+
+# Tool-free /agent replies, kept apart from /chat's so neither endpoint
+# answers with the other's reply. Prompts are embedded with _semantic_cache,
+# so the embedding model is loaded only once.
+_agent_cache = SemanticCache()
+
+# Words that suggest an /agent prompt needs Google Workspace tools; prompts
+# without any of them may be looked up in the semantic cache. This is only a
+# lookup pre-filter: replies are cached only when the run used no tools.
+_TOOL_WORDS = re.compile(
+    r"\b(e-?mails?|gmail|inbox|mail|send|sent|reply|draft|"
+    r"sheets?|spreadsheets?|rows?|cells?|docs?|documents?|drive|files?|"
+    r"calendar|schedule|meeting|create|update|add|append|delete|read|search|find|list)\b",
+    re.IGNORECASE
+)
+
+def _needs_tools(prompt: str) -> bool:
+    """Whether an agent prompt likely needs tools, so a cache lookup is not worth it"""
+    return _TOOL_WORDS.search(prompt) is not None
+
+# Upload limits
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024  # Reject uploads larger than 20 MB up front
+UPLOAD_PREVIEW_CHARS = 10000  # Characters of an uploaded document sent for summarizing as-is
+ANALYZE_PREVIEW_CHARS = 8000  # Characters of a document sent with an analysis request as-is
+
+# Longer documents are split into overlapping chunks (~3000 tokens each, at
+# ~4 characters per token) that are summarized in parallel, and the chunk
+# summaries are sent in place of the text
+DOC_CHUNK_CHARS = 12000
+DOC_CHUNK_OVERLAP = 800
+MAX_DOC_CHUNKS = 16
+DOCUMENT_MAX_CHARS = MAX_DOC_CHUNKS * (DOC_CHUNK_CHARS - DOC_CHUNK_OVERLAP)
+# Chunk summaries in flight across all uploads, so one long document cannot
+# take every Groq slot or set off a burst of rate-limited requests
+SUMMARY_MAX_CONCURRENCY = 4
+_SUMMARY_SEMAPHORE = asyncio.Semaphore(SUMMARY_MAX_CONCURRENCY)
+
+# /analyze-document output token budgets; generation time grows with output
+# length, so short factual questions get a short budget. gpt-oss is a
+# reasoning model whose reasoning tokens count against max_tokens, so short
+# budgets run with low reasoning effort and still leave room for reasoning.
+ANALYZE_MAX_TOKENS = 2000
+_DETAILED_REQUEST = re.compile(r"\b(analy[sz]e|analysis|review|comprehensive|detailed?|in[- ]depth|compare|explain)\b", re.IGNORECASE)
+_SUMMARY_REQUEST = re.compile(r"\b(summar(y|ise|ize)|overview|outline|key points)\b", re.IGNORECASE)
+_FACTUAL_QUESTION = re.compile(r"^\s*(what|when|who|where|which|how (much|many))\b", re.IGNORECASE)
+SHORT_QUESTION_CHARS = 120
+
+def _budget(prompt: str) -> int:
+    """Pick max_tokens for an analysis request from the kind of answer it asks for"""
+    if _DETAILED_REQUEST.search(prompt):
+        return ANALYZE_MAX_TOKENS
+    if _SUMMARY_REQUEST.search(prompt):
+        return 1200
+    if _FACTUAL_QUESTION.search(prompt) and len(prompt) <= SHORT_QUESTION_CHARS:
+        return 600
+    return ANALYZE_MAX_TOKENS
+
+# /analyze-document prompt templates
+_SYSTEM_PROMPT_TPL = """
+You are Autoclerk, an expert AI assistant specialized in comprehensive document analysis. 
+You provide detailed, insightful analysis of documents based on specific user requests.
+
+Document Analysis Guidelines:
+1. Read and understand the entire document thoroughly
+2. Focus on the user's specific request/question
+3. Provide structured, detailed analysis
+4. Include relevant quotes and specific references
+5. Offer actionable insights when applicable
+6. Highlight key findings, risks, opportunities, or important information
+7. Use professional, clear language
+
+Document filename: {filename}
+Document type: {content_type}
+"""
+
+_USER_MESSAGE_TPL = """
+User Request: {prompt}
+
+Document Content:
+{document}
+
+Please provide a comprehensive analysis based on my request above.
+"""
+
+# PDFs with at least this many pages, read in full, are split across worker processes
+PDF_PARALLEL_MIN_PAGES = 50
+PDF_PAGES_PER_TASK = 25  # Small tasks, so work past max_chars can be cancelled
+PDF_MAX_WORKERS = min(os.cpu_count() or 1, 4)
+
+@lru_cache(maxsize=1)
+def _pdf_pool() -> ProcessPoolExecutor:
+    """Create the PDF extraction process pool on first use"""
+    # Forking a multi-threaded server (pdfium, faiss and torch state) can
+    # deadlock the child, so workers start from a clean forkserver/spawn process
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return ProcessPoolExecutor(max_workers=PDF_MAX_WORKERS, mp_context=multiprocessing.get_context(start_method))
+
+# PDFium is not thread-safe and pypdfium2 does not serialize calls into it,
+# so every in-process pdfium call (parsing runs in the threadpool) holds this
+_PDFIUM_LOCK = threading.Lock()
 
 # Document parsing functions
-def extract_text_from_pdf(file_content: bytes) -> str:
-    """Extract text from PDF file"""
+def extract_text_from_pdf(file_content: Union[bytes, BinaryIO], max_chars: Optional[int] = None) -> str:
+    """Extract text from PDF file, stopping once max_chars have been collected"""
     try:
-        pdf_file = io.BytesIO(file_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
+        pdf_file = io.BytesIO(file_content) if isinstance(file_content, bytes) else file_content
+        with _PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(pdf_file)
+            try:
+                num_pages = len(pdf)
+                if num_pages < PDF_PARALLEL_MIN_PAGES:
+                    return extract_pages(pdf, 0, num_pages, max_chars).strip()
+            finally:
+                pdf.close()
+        
+        # Large documents: workers extract page ranges from a temporary copy on
+        # disk, so the document is not shipped to every task. Results are
+        # consumed in page order and tasks not needed for max_chars are cancelled.
+        # Each worker is single-threaded, so these calls need no lock.
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            if isinstance(file_content, bytes):
+                tmp.write(file_content)
+            else:
+                file_content.seek(0)
+                shutil.copyfileobj(file_content, tmp)
+        try:
+            futures = [
+                _pdf_pool().submit(extract_page_range, tmp.name, start, min(start + PDF_PAGES_PER_TASK, num_pages))
+                for start in range(0, num_pages, PDF_PAGES_PER_TASK)
+            ]
+            parts: List[str] = []
+            length = 0
+            try:
+                for future in futures:
+                    parts.append(future.result())
+                    length += len(parts[-1])
+                    if max_chars is not None and length >= max_chars:
+                        break
+            finally:
+                for future in futures:
+                    future.cancel()
+                # Running tasks still read the file; wait for them before deleting it
+                for future in futures:
+                    if not future.cancelled():
+                        future.exception()
+            return "".join(parts).strip()
+        finally:
+            os.unlink(tmp.name)
     except Exception as e:
         return f"Error extracting PDF text: {str(e)}"
 
-def extract_text_from_docx(file_content: bytes) -> str:
-    """Extract text from DOCX file"""
+def extract_text_from_docx(file_content: Union[bytes, BinaryIO], max_chars: Optional[int] = None) -> str:
+    """Extract text from DOCX file, stopping once max_chars have been collected"""
     try:
-        docx_file = io.BytesIO(file_content)
+        docx_file = io.BytesIO(file_content) if isinstance(file_content, bytes) else file_content
         doc = Document(docx_file)
-        text = ""
+        parts: List[str] = []
+        length = 0
         for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
-        return text.strip()
+            parts.append(paragraph.text)
+            length += len(paragraph.text) + 1
+            if max_chars is not None and length >= max_chars:
+                break
+        return "\n".join(parts).strip()
     except Exception as e:
         return f"Error extracting DOCX text: {str(e)}"
 
+def extract_text_from_plain(file_content: Union[bytes, BinaryIO], max_chars: Optional[int] = None) -> str:
+    """Decode UTF-8 text, reading only enough bytes for max_chars characters"""
+    if not isinstance(file_content, bytes):
+        # UTF-8 is at most 4 bytes per character; a split trailing character is dropped
+        file_content = file_content.read(max_chars * 4 if max_chars is not None else -1)
+    return file_content.decode("utf-8", errors="ignore")
+
+# Text extractor for each supported upload content type
+_EXTRACTORS = {
+    "text/plain": extract_text_from_plain,
+    "application/pdf": extract_text_from_pdf,
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document": extract_text_from_docx,
+}
+_ALLOWED_TYPES = frozenset(_EXTRACTORS)
+
 
 
+def _chunk(text: str, size: int = DOC_CHUNK_CHARS, overlap: int = DOC_CHUNK_OVERLAP) -> List[str]:
+    """Split text into overlapping chunks; DOCUMENT_MAX_CHARS of text makes MAX_DOC_CHUNKS of them"""
+    step = size - overlap
+    return [text[start:start + size] for start in range(0, max(len(text) - overlap, 1), step)]
+
+async def _condense_document(text: str, limit: int) -> str:
+    """Return text if it fits in limit, otherwise summaries of its chunks in document order"""
+    # Extraction stops at DOCUMENT_MAX_CHARS, so text reaching it was cut short
+    truncated = len(text) >= DOCUMENT_MAX_CHARS
+    text = text[:DOCUMENT_MAX_CHARS]
+    if len(text) <= limit:
+        return text
+    
+    async def summarize(index: int, chunk: str):
+        async with _SUMMARY_SEMAPHORE:
+            return await _groq_completion(
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are Autoclerk, an AI assistant specialized in document analysis. "
+                                   "Summarize this part of a longer document, keeping key facts, figures, names and dates."
+                    },
+                    {"role": "user", "content": f"Part {index} of {len(chunks)}:\n\n{chunk}"}
+                ],
+                model="openai/gpt-oss-20b"
+            )
+    
+    chunks = _chunk(text)
+    completions = await asyncio.gather(*[summarize(index, chunk) for index, chunk in enumerate(chunks, 1)])
+    condensed = "\n\n".join(
+        f"[Part {index} summary]\n{completion.choices[0].message.content}"
+        for index, completion in enumerate(completions, 1)
+    )
+    if truncated:
+        condensed += (
+            f"\n\n[Note: the document is longer than {DOCUMENT_MAX_CHARS} characters; "
+            f"only the first {DOCUMENT_MAX_CHARS} were summarized above.]"
+        )
+    return condensed
+
 class ChatRequest(BaseModel):
     prompt: str
     history: List[Dict[str, str]] = []
+    stream: bool = False
+
+# Server-Sent Events streaming of LLM responses
+async def _groq_deltas(messages: List[Dict[str, str]], **params) -> AsyncIterator[str]:
+    """Start a streamed completion and yield its text deltas"""
+    stream = await _groq_completion(
+        messages=messages,
+        model="openai/gpt-oss-20b",
+        stream=True,
+        **params
+    )
+    
+    async def deltas():
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    return deltas()
+
+async def _single_delta(text: str) -> AsyncIterator[str]:
+    yield text
+
+def _sse_response(deltas: AsyncIterator[str], on_complete: Optional[Callable[[str], None]] = None) -> StreamingResponse:
+    """
+    Stream text deltas as Server-Sent Events
+    
+    Each event is `data: {"delta": "..."}`; the stream ends with `data: [DONE]`,
+    preceded by `data: {"error": "..."}` if generation fails part way.
+    """
+    async def events():
+        parts = []
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                yield b"data: " + orjson.dumps({"delta": delta}) + b"\n\n"
+        except Exception as e:
+            print(f"Error from AI model: {e}")
+            yield b"data: " + orjson.dumps({"error": str(e)}) + b"\n\n"
+        else:
+            if on_complete is not None:
+                on_complete("".join(parts))
+        yield b"data: [DONE]\n\n"
+    
+    # An explicit identity encoding keeps GZipMiddleware from buffering events
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "Content-Encoding": "identity"}
+    )
 
 
 
 @app.post("/chat")
 async def chat_with_llm(request: ChatRequest):
     try:
+        # Without history the answer depends only on the prompt, so a
+        # semantically equivalent recent prompt can be answered from cache
+        embedding = None
+        if not request.history:
+            embedding = await asyncio.to_thread(_semantic_cache.embed, request.prompt)
+            cached = _semantic_cache.get(embedding)
+            if cached is not None:
+                if request.stream:
+                    return _sse_response(_single_delta(cached))
+                return {"response": cached}
+        
         messages = [
             {
                 "role": "system",
@@ -95,30 +436,43 @@ async def chat_with_llm(request: ChatRequest):
             }
         ]
 
-        chat_completion = client.chat.completions.create(
+        if request.stream:
+            return _sse_response(
+                await _groq_deltas(messages),
+                on_complete=lambda response: _semantic_cache.put(embedding, response)
+            )
+
+        chat_completion = await _groq_completion(
             messages=messages,
             # model="llama3-70b-8192",  # Still using Llama model but with Autoclerk identity
             model="openai/gpt-oss-20b"
         )
-        return {"response": chat_completion.choices[0].message.content}
+        response = chat_completion.choices[0].message.content
+        _semantic_cache.put(embedding, response)
+        return {"response": response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/upload-document")
-async def upload_document(file: UploadFile = File(...)):
+async def upload_document(file: UploadFile = File(...), stream: bool = Form(default=False)):
     try:
         # Validate file type
-        allowed_types = ["text/plain", "application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
-        if file.content_type not in allowed_types:
+        if file.content_type not in _ALLOWED_TYPES:
             raise HTTPException(status_code=400, detail="File type not supported")
 
-        # Read file content
-        content = await file.read()
+        # Validate file size
+        if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="File too large")
+
+        # Read only as much of the file as the chunked summary can use. Parse
+        # straight from the spooled upload instead of copying it into memory,
+        # in a worker thread so the event loop stays responsive
+        content = await run_in_threadpool(
+            _EXTRACTORS[file.content_type], file.file, max_chars=DOCUMENT_MAX_CHARS
+        )
         
-        # For text files, decode directly
-        if file.content_type == "text/plain":
-            content = content.decode("utf-8")
-        # For other types, you would need appropriate parsing logic
+        # Long documents are summarized chunk by chunk first
+        content = await _condense_document(content, UPLOAD_PREVIEW_CHARS)
         
         # Send the document content to the AI for analysis
         messages = [
@@ -128,12 +482,15 @@ async def upload_document(file: UploadFile = File(...)):
             },
             {
                 "role": "user",
-                "content": f"Analyze the following document: {content[:10000]}"  # Limit content size
+                "content": f"Analyze the following document: {content}"
             }
         ]
 
         try:
-            chat_completion = client.chat.completions.create(
+            if stream:
+                return _sse_response(await _groq_deltas(messages))
+            
+            chat_completion = await _groq_completion(
                 messages=messages,
                 model="openai/gpt-oss-20b"
             )
@@ -150,7 +507,8 @@ async def upload_document(file: UploadFile = File(...)):
 async def analyze_document_with_prompt(
     file: UploadFile = File(...),
     prompt: str = Form(...),
-    history: str = Form(default="[]")
+    history: str = Form(default="[]"),
+    stream: bool = Form(default=False)
 ):
     """
     Enhanced document analysis endpoint that accepts both file and user prompt
@@ -158,74 +516,64 @@ async def analyze_document_with_prompt(
     """
     try:
         # Validate file type
-        allowed_types = ["text/plain", "application/pdf", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
-        if file.content_type not in allowed_types:
+        if file.content_type not in _ALLOWED_TYPES:
             raise HTTPException(status_code=400, detail="File type not supported")
 
-        # Read and process file content
-        content = await file.read()
-        
-        # Parse content based on file type
-        if file.content_type == "text/plain":
-            document_text = content.decode("utf-8")
-        elif file.content_type == "application/pdf":
-            document_text = extract_text_from_pdf(content)
-        elif file.content_type == "application/vnd.openxmlformats-officedocument.wordprocessingml.document":
-            document_text = extract_text_from_docx(content)
-        else:
-            document_text = content.decode("utf-8", errors='ignore')
+        # Validate file size
+        if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail="File too large")
+
+        # Parse content based on file type, off the event loop, up to what the
+        # chunked summary can use. Documents are parsed straight from the
+        # upload's spooled temporary file (on disk once it is large).
+        document_text = await run_in_threadpool(
+            _EXTRACTORS[file.content_type], file.file, max_chars=DOCUMENT_MAX_CHARS
+        )
         
-        # Parse history
+        # Parse history; anything but a JSON list is treated as no history
         try:
-            chat_history = json.loads(history)
-        except:
+            chat_history = orjson.loads(history) if history else []
+        except orjson.JSONDecodeError:
+            chat_history = []
+        if not isinstance(chat_history, list):
             chat_history = []
         
-        # Create enhanced system prompt for document analysis
-        system_prompt = f"""
-You are Autoclerk, an expert AI assistant specialized in comprehensive document analysis. 
-You provide detailed, insightful analysis of documents based on specific user requests.
-
-Document Analysis Guidelines:
-1. Read and understand the entire document thoroughly
-2. Focus on the user's specific request/question
-3. Provide structured, detailed analysis
-4. Include relevant quotes and specific references
-5. Offer actionable insights when applicable
-6. Highlight key findings, risks, opportunities, or important information
-7. Use professional, clear language
-
-Document filename: {file.filename}
-Document type: {file.content_type}
-"""
-        
-        # Build the conversation messages
-        messages = [{"role": "system", "content": system_prompt}]
-        
-        # Add chat history
-        for msg in chat_history:
-            messages.append(msg)
+        # Long documents are summarized chunk by chunk first
+        document_body = await _condense_document(document_text, ANALYZE_PREVIEW_CHARS)
         
-        # Add the current request with document
-        user_message = f"""
-User Request: {prompt}
-
-Document Content:
-{document_text[:8000]}  # Limit to avoid token limits
-
-Please provide a comprehensive analysis based on my request above.
-"""
-        
-        messages.append({"role": "user", "content": user_message})
+        # Build the conversation: system prompt, chat history, then the
+        # current request with the document
+        messages = [
+            {"role": "system", "content": _SYSTEM_PROMPT_TPL.format(filename=file.filename, content_type=file.content_type)},
+            *chat_history,
+            {"role": "user", "content": _USER_MESSAGE_TPL.format(prompt=prompt, document=document_body)}
+        ]
 
         # Call AI model
         try:
-            chat_completion = client.chat.completions.create(
+            # A stream cannot be retried once it is cut off, so it gets the full budget
+            if stream:
+                return _sse_response(await _groq_deltas(messages, max_tokens=ANALYZE_MAX_TOKENS, temperature=0.1))
+            
+            # Longer responses only when the request calls for them
+            budget = _budget(prompt)
+            reasoning = {"reasoning_effort": "low"} if budget < ANALYZE_MAX_TOKENS else {}
+            chat_completion = await _groq_completion(
                 messages=messages,
                 model="openai/gpt-oss-20b",
-                max_tokens=2000,  # Allow for longer responses
-                temperature=0.1   # Lower temperature for more focused analysis
+                max_tokens=budget,
+                temperature=0.1,  # Lower temperature for more focused analysis
+                **reasoning
             )
+            
+            # An answer cut off by the short budget is asked again with the full one
+            if chat_completion.choices[0].finish_reason == "length" and budget < ANALYZE_MAX_TOKENS:
+                chat_completion = await _groq_completion(
+                    messages=messages,
+                    model="openai/gpt-oss-20b",
+                    max_tokens=ANALYZE_MAX_TOKENS,
+                    temperature=0.1
+                )
             return {"response": chat_completion.choices[0].message.content}
         except Exception as ai_e:
             print(f"Error from AI model: {ai_e}")
@@ -243,27 +591,67 @@ async def agent_chat(request: ChatRequest):
     """
     try:
         # Check if user is authenticated for Google services
-        if not is_authenticated():
+        if not _is_auth_cached():
             return {
                 "response": "To use Google services (Docs, Sheets, Gmail), please authenticate first by visiting: http://localhost:8000/oauth/login",
                 "requires_auth": True,
                 "auth_url": "http://localhost:8000/oauth/login"
             }
         
-        # Create agent if not already created
-        agent_manager = AgentManager()
+        # Prompts that look tool-free may be answered from a semantically
+        # equivalent recent prompt without building or running the agent
+        embedding = None
+        if not _needs_tools(request.prompt):
+            embedding = await asyncio.to_thread(_semantic_cache.embed, request.prompt)
+            cached = _agent_cache.get(embedding)
+            if cached is not None:
+                return {"response": cached}
         
-        # Run the agent with the user's prompt
-        response = agent_manager.run(request.prompt)
+        # Reuse the agent manager across requests
+        agent_manager = await _get_agent_manager()
+        
+        # Run the agent with the user's prompt; it blocks, so keep it off the event loop
+        response, steps = await run_in_threadpool(agent_manager.run_with_steps, request.prompt)
         
         # If response is empty, return a message indicating the action was completed
         if not response or response.strip() == "":
             return {"response": "Task completed successfully. The requested operation was performed."}
         
+        # Only a reply that used no tools is plain chat and safe to replay
+        if not steps:
+            _agent_cache.put(embedding, response)
         return {"response": response}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# Pages shown in the browser at the end of the OAuth flow
+_OAUTH_SUCCESS_HTML = """
+        <html>
+            <head><title>Authentication Success</title></head>
+            <body style="font-family: Arial, sans-serif; text-align: center; padding: 50px;">
+                <h1 style="color: green;">✅ Authentication Successful!</h1>
+                <p>You can now close this window and use Google services in AutoClerk.</p>
+                <script>
+                    // Try to close the window after 3 seconds
+                    setTimeout(() => {
+                        window.close();
+                    }, 3000);
+                </script>
+            </body>
+        </html>
+        """.encode("utf-8")
+
+_OAUTH_ERROR_HTML_TPL = """
+        <html>
+            <head><title>Authentication Error</title></head>
+            <body style="font-family: Arial, sans-serif; text-align: center; padding: 50px;">
+                <h1 style="color: red;">❌ Authentication Failed</h1>
+                <p>Error: {error}</p>
+                <p>Please try again or contact support.</p>
+            </body>
+        </html>
+        """
+
 @app.get("/oauth/login")
 async def oauth_login():
     """
@@ -291,6 +679,7 @@ async def oauth_callback(request: Request):
     """
     Handle OAuth callback from Google
     """
+    global _auth_cache
     try:
         # Get the authorization code from the callback
         code = request.query_params.get('code')
@@ -306,34 +695,15 @@ async def oauth_callback(request: Request):
         # Save credentials
         save_credentials(flow.credentials)
         
+        # Update the cached auth state for /oauth/status and /agent
+        _auth_cache = (True, flow.credentials.expiry)
+        _is_auth_cached.cache_clear()
+        
         # Return success page
-        return """
-        <html>
-            <head><title>Authentication Success</title></head>
-            <body style="font-family: Arial, sans-serif; text-align: center; padding: 50px;">
-                <h1 style="color: green;">✅ Authentication Successful!</h1>
-                <p>You can now close this window and use Google services in AutoClerk.</p>
-                <script>
-                    // Try to close the window after 3 seconds
-                    setTimeout(() => {
-                        window.close();
-                    }, 3000);
-                </script>
-            </body>
-        </html>
-        """
+        return HTMLResponse(content=_OAUTH_SUCCESS_HTML, status_code=200)
         
     except Exception as e:
-        return f"""
-        <html>
-            <head><title>Authentication Error</title></head>
-            <body style="font-family: Arial, sans-serif; text-align: center; padding: 50px;">
-                <h1 style="color: red;">❌ Authentication Failed</h1>
-                <p>Error: {str(e)}</p>
-                <p>Please try again or contact support.</p>
-            </body>
-        </html>
-        """
+        return HTMLResponse(content=_OAUTH_ERROR_HTML_TPL.format(error=html.escape(str(e))))
 
 @app.get("/oauth/status")
 async def oauth_status():
@@ -341,15 +711,20 @@ async def oauth_status():
     Check OAuth authentication status
     """
     try:
-        authenticated = is_authenticated()
+        # Serve the cached state unless it is unauthenticated or close to expiring
+        # (credential expiry is naive UTC)
+        auth_state = _auth_cache
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        if auth_state is None or not auth_state[0] or auth_state[1] is None \
+                or auth_state[1] - now < AUTH_REVALIDATE_WINDOW:
+            auth_state = _refresh_auth_cache()
+        authenticated, expiry = auth_state
         
         if authenticated:
-            # Get some basic info about the stored credentials
-            creds = get_stored_credentials(ALL_SCOPES)
             return {
                 "authenticated": True,
                 "scopes": ALL_SCOPES,
-                "expires_at": creds.expiry.isoformat() if creds.expiry else None
+                "expires_at": expiry
             }
         else:
             return {
@@ -370,17 +745,13 @@ async def oauth_debug():
     Debug OAuth configuration
     """
     try:
-        from agent.tools.google_auth import get_client_secrets_path
-        import json
-        
-        # Read client secrets
-        with open(get_client_secrets_path(), 'r') as f:
-            client_config = json.load(f)
+        # Client secrets are parsed once and cached
+        web_config = load_client_config()['web']
         
         return {
-            "client_id": client_config['web']['client_id'],
-            "project_id": client_config['web']['project_id'],
-            "configured_redirect_uris": client_config['web']['redirect_uris'],
+            "client_id": web_config['client_id'],
+            "project_id": web_config['project_id'],
+            "configured_redirect_uris": web_config['redirect_uris'],
             "current_redirect_uri": "http://localhost:8000/oauth/callback",
             "auth_url": "http://localhost:8000/oauth/login",
             "required_scopes": ALL_SCOPES
@@ -0,0 +1,32 @@
+# PDF text extraction helpers
+#
+# Kept out of main.py so the extraction worker processes import only this
+# module, not the FastAPI app (which needs GROQ_API_KEY and builds clients).
+
+from typing import List, Optional
+
+import pypdfium2 as pdfium
+
+def extract_pages(pdf, start: int, stop: int, max_chars: Optional[int] = None) -> str:
+    """Extract text from pages [start, stop) of an open PDF"""
+    parts: List[str] = []
+    length = 0
+    for index in range(start, stop):
+        page = pdf[index]
+        textpage = page.get_textpage()
+        parts.append(textpage.get_text_bounded())
+        # Free the native page objects as soon as they are read
+        textpage.close()
+        page.close()
+        length += len(parts[-1]) + 1
+        if max_chars is not None and length >= max_chars:
+            break
+    return "".join(part + "\n" for part in parts)
+
+def extract_page_range(pdf_path: str, start: int, stop: int) -> str:
+    """Extract text from pages [start, stop) of a PDF file; runs in a worker process"""
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        return extract_pages(pdf, start, stop)
+    finally:
+        pdf.close()
@@ -0,0 +1,194 @@
+# Semantic response cache for the LLM endpoints
+#
+# Prompts are embedded with a small local model and matched against earlier
+# prompts by cosine similarity, so a rephrased repeat of a recent question is
+# answered from memory instead of another Groq round trip.
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+try:
+    import faiss
+    import numpy as np
+except ImportError:  # The cache is simply disabled without faiss/numpy
+    faiss = None
+    np = None
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+
+# Set SEMANTIC_CACHE=0 to turn the cache off
+SEMANTIC_CACHE_ENABLED = os.environ.get("SEMANTIC_CACHE", "1") != "0"
+
+@dataclass
+class CacheEntry:
+    response: str
+    expires_at: float
+    last_used: float
+
+class SemanticCache:
+    """
+    In-memory cache of LLM responses keyed by prompt embeddings
+
+    Embeddings are L2-normalized, so inner product in the FAISS index is
+    cosine similarity. Entries expire after their TTL and the least recently
+    used entries are evicted once the cache is full.
+    """
+
+    def __init__(self, threshold: float = 0.85, max_entries: int = 1000, default_ttl: float = 300,
+                 max_embeddings: int = 4096):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.enabled = SEMANTIC_CACHE_ENABLED and faiss is not None
+        self._model = None
+        self._model_lock = threading.Lock()
+        # Embeddings of recent prompts by (sha256 of the prompt, model), in LRU order
+        self.max_embeddings = max_embeddings
+        self._embeddings = OrderedDict()
+        self._embeddings_lock = threading.Lock()
+        self._index = None
+        self._entries: Dict[int, CacheEntry] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _disable(self, error: Exception):
+        """Turn the cache off after an unexpected error, so callers just see misses"""
+        logger.warning("Semantic cache disabled after error: %s", error, exc_info=True)
+        self.enabled = False
+
+    def _get_model(self):
+        """Load the embedding model on first use"""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    try:
+                        from sentence_transformers import SentenceTransformer
+                    except ImportError:
+                        self.enabled = False
+                        return None
+                    self._model = SentenceTransformer(EMBEDDING_MODEL)
+        return self._model
+
+    def embed(self, text: str):
+        """Return the normalized embedding of text, or None when the cache is disabled"""
+        return self.get_or_embed([text])[0]
+
+    def get_or_embed(self, texts: List[str]) -> list:
+        """
+        Return the normalized embedding of each text, each shaped (1, dim)
+
+        Previously seen texts are served from the embedding cache and the rest
+        are encoded in a single model call. Returns Nones when the cache is
+        disabled.
+        """
+        if not self.enabled:
+            return [None] * len(texts)
+        try:
+            return self._get_or_embed(texts)
+        except Exception as e:
+            # e.g. the model could not be downloaded; don't retry on every request
+            self._disable(e)
+            return [None] * len(texts)
+
+    def _get_or_embed(self, texts: List[str]) -> list:
+        model = self._get_model()
+        if model is None:
+            return [None] * len(texts)
+
+        keys = [(hashlib.sha256(text.encode('utf-8')).hexdigest(), EMBEDDING_MODEL) for text in texts]
+        embeddings = [None] * len(texts)
+        missing = []
+        with self._embeddings_lock:
+            for i, key in enumerate(keys):
+                embedding = self._embeddings.get(key)
+                if embedding is None:
+                    missing.append(i)
+                else:
+                    self._embeddings.move_to_end(key)
+                    embeddings[i] = embedding
+
+        if missing:
+            encoded = model.encode([texts[i] for i in missing], normalize_embeddings=True,
+                                   convert_to_numpy=True).astype('float32')
+            with self._embeddings_lock:
+                for row, i in enumerate(missing):
+                    embedding = encoded[row:row + 1]
+                    embeddings[i] = embedding
+                    self._embeddings[keys[i]] = embedding
+                while len(self._embeddings) > self.max_embeddings:
+                    self._embeddings.popitem(last=False)
+        return embeddings
+
+    def get(self, embedding) -> Optional[str]:
+        """Return the cached response for the closest earlier prompt, if similar enough"""
+        if embedding is None or not self.enabled:
+            return None
+        try:
+            return self._get(embedding)
+        except Exception as e:
+            self._disable(e)
+            return None
+
+    def _get(self, embedding) -> Optional[str]:
+        with self._lock:
+            now = time.monotonic()
+            self._remove_expired(now)
+            if self._index is None or self._index.ntotal == 0:
+                return None
+
+            scores, ids = self._index.search(embedding, 1)
+            entry_id = int(ids[0][0])
+            if entry_id == -1 or scores[0][0] < self.threshold:
+                return None
+
+            entry = self._entries[entry_id]
+            entry.last_used = now
+            return entry.response
+
+    def put(self, embedding, response: str, ttl: Optional[float] = None):
+        """Cache response under the prompt's embedding"""
+        if embedding is None or not self.enabled:
+            return
+        try:
+            self._put(embedding, response, ttl)
+        except Exception as e:
+            self._disable(e)
+
+    def _put(self, embedding, response: str, ttl: Optional[float]):
+        with self._lock:
+            now = time.monotonic()
+            if self._index is None:
+                self._index = faiss.IndexIDMap(faiss.IndexFlatIP(embedding.shape[1]))
+
+            entry_id = self._next_id
+            self._next_id += 1
+            self._index.add_with_ids(embedding, np.array([entry_id], dtype='int64'))
+            self._entries[entry_id] = CacheEntry(
+                response=response,
+                expires_at=now + (self.default_ttl if ttl is None else ttl),
+                last_used=now
+            )
+
+            self._remove_expired(now)
+            overflow = len(self._entries) - self.max_entries
+            if overflow > 0:
+                oldest = sorted(self._entries, key=lambda i: self._entries[i].last_used)[:overflow]
+                self._remove(oldest)
+
+    def _remove_expired(self, now: float):
+        expired = [i for i, entry in self._entries.items() if entry.expires_at <= now]
+        if expired:
+            self._remove(expired)
+
+    def _remove(self, entry_ids):
+        self._index.remove_ids(np.array(entry_ids, dtype='int64'))
+        for entry_id in entry_ids:
+            del self._entries[entry_id]
@@ -23,16 +23,27 @@ def print_startup_info():
     print("   - Check status: http://localhost:8000/oauth/status")
     print("3. Once authenticated, you can use all Google tools!")
     print("=" * 60)
+    print("⚙️  Server Options (environment variables):")
+    print("   - DEV=1: Reload the server when code changes (development only)")
+    print("   - WORKERS=N: Number of worker processes (default 1, ignored with DEV=1)")
+    print("   - GROQ_MAX_CONCURRENCY=N: Groq requests in flight per worker (default 8)")
+    print("=" * 60)
     print()
 
 if __name__ == "__main__":
     print_startup_info()
     
-    # Start the server
+    # Start the server; uvloop and httptools come with uvicorn[standard]
+    # (uvloop is not available on Windows). The event loop is chosen here at
+    # the entrypoint rather than by installing a loop policy on import, so
+    # importing the app or the agent package never changes the caller's loop.
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=os.getenv("DEV") == "1",
+        workers=int(os.getenv("WORKERS", "1")),
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info"
     )
\ No newline at end of file